@@ -24,86 +24,33 @@ __version__ = "3.1.1"
 __author__ = "Serpensin"
 __license__ = "AGPL-3.0"
 
-# Conditional imports based on available dependencies
-try:
-    from . import bitmap_handler
-except ImportError:
-    pass
-
-try:
-    from . import log_handler
-except ImportError:
-    pass
-
-try:
-    from . import app_translation
-except ImportError:
-    pass
-
-try:
-    from . import bot_directory
-except ImportError:
-    pass
-
-try:
-    from . import database_handler
-except ImportError:
-    pass
-
-try:
-    from . import googletrans
-except ImportError:
-    pass
-
-try:
-    from . import invite_tracker
-except ImportError:
-    pass
-
-try:
-    from . import killswitch
-except ImportError:
-    pass
-
-try:
-    from . import libretrans
-except ImportError:
-    pass
-
-try:
-    from . import patchnotes
-except ImportError:
-    pass
-
-try:
-    from . import private_voice
-except ImportError:
-    pass
-
-try:
-    from . import random_usernames
-except ImportError:
-    pass
-
-try:
-    from . import stat_dock
-except ImportError:
-    pass
-
-try:
-    from . import steam
-except ImportError:
-    pass
-
-try:
-    from . import steam_charts
-except ImportError:
-    pass
-
-try:
-    from . import twitch
-except ImportError:
-    pass
+import importlib
+import importlib.util
+import sys
+from typing import Any, Dict, List, Tuple
+
+# Submodules are imported on first attribute access (PEP 562), so importing the
+# package does not pull in discord, aiohttp, colorama, ... of unused modules.
+# Module name -> (pip extra, top-level imports of its optional dependencies)
+_MODULES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "app_translation": ("apptranslation", ("discord",)),
+    "bitmap_handler": ("bitmaphandler", ()),
+    "bot_directory": ("botdirectory", ("aiohttp",)),
+    # Database drivers are imported per backend on connect
+    "database_handler": ("databasehandler", ()),
+    "googletrans": ("googletrans", ("google.auth", "google.cloud.translate_v2")),
+    "invite_tracker": ("invitetracker", ("discord",)),
+    "killswitch": ("killswitch", ("aiohttp", "html2text", "bs4")),
+    "libretrans": ("libretrans", ("aiofiles", "aiohttp")),
+    "log_handler": ("loghandler", ("colorama",)),
+    "patchnotes": ("patchnotes", ("aiohttp", "html2text", "bs4")),
+    "private_voice": ("privatevoice", ("discord",)),
+    "random_usernames": ("randomusernames", ()),
+    "stat_dock": ("statdock", ("discord", "pytz")),
+    "steam": ("steam", ("aiohttp", "bs4")),
+    "steam_charts": ("steamcharts", ("aiohttp", "bs4")),
+    "twitch": ("twitch", ("aiohttp", "requests")),
+}
 
 __all__ = [
     "app_translation",
@@ -123,3 +70,60 @@ __all__ = [
     "steam_charts",
     "twitch",
 ]
+
+
+class MissingDependencyError(AttributeError):
+    """
+    Raised when a submodule is accessed whose optional dependencies are missing.
+
+    It is an AttributeError, so hasattr(CustomModules, "stat_dock") and
+    getattr(CustomModules, "stat_dock", None) keep working as feature checks.
+    (CPython cannot combine it with ImportError: both add their own fields.)
+    """
+
+
+def _is_installed(import_name: str) -> bool:
+    """Check whether a dependency can be imported, without importing it"""
+    if import_name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(import_name) is not None
+    except (ImportError, ValueError):
+        # Parent package missing (e.g. google for google.cloud.translate_v2)
+        return False
+
+
+def missing_dependencies(module: str) -> List[str]:
+    """Return the optional dependencies of a submodule that are not installed"""
+    if module not in _MODULES:
+        raise ValueError(f"Unknown module: {module}. Available: {', '.join(__all__)}")
+    return [name for name in _MODULES[module][1] if not _is_installed(name)]
+
+
+def available_modules() -> List[str]:
+    """Return the submodules whose optional dependencies are installed"""
+    return [module for module in __all__ if not missing_dependencies(module)]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        module = importlib.import_module(f".{name}", __name__)
+    except ImportError as e:
+        missing = missing_dependencies(name)
+        extra = _MODULES[name][0]
+        detail = f"missing: {', '.join(missing)}" if missing else str(e)
+        raise MissingDependencyError(
+            f"CustomModules.{name} could not be imported ({detail}). "
+            f'Install its dependencies with: pip install "CustomModules[{extra}]"',
+            name=name,
+            obj=sys.modules[__name__],
+        ) from e
+    # Cache it, later lookups no longer go through __getattr__
+    globals()[name] = module
+    return module
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -17,6 +17,13 @@ from typing import Optional
 
 import discord
 
+from CustomModules.database_handler import (
+    Index,
+    Migration,
+    apply_migrations,
+    register_migrations,
+)
+
 if sys.version_info < (3, 10):
     raise ImportError("This module requires Python 3.10 or higher to work correctly.")
 
@@ -28,6 +35,66 @@ _bot: discord.Client
 _logger: logging.Logger
 internal_db_connection: bool
 
+# Schema versions, applied once per database by __setup_database()
+register_migrations(
+    "private_voice",
+    [
+        Migration(
+            1,
+            "create PRIVATEVOICE tables",
+            [
+                """
+    CREATE TABLE IF NOT EXISTS "PRIVATEVOICE_OPENCHANNELS" (
+        "id" INTEGER NOT NULL,
+        "guild_id" INTEGER NOT NULL,
+        "channel_id" INTEGER NOT NULL,
+        "channelowner_id" INTEGER NOT NULL,
+        "public" BOOLEAN NOT NULL,
+        "permit_update" BOOLEAN NOT NULL,
+        PRIMARY KEY ("id" AUTOINCREMENT)
+    )
+    """,
+                """
+    CREATE TABLE IF NOT EXISTS "PRIVATEVOICE_SETTINGS" (
+          "id" INTEGER NOT NULL,
+          "guild_id" INTEGER NOT NULL,
+          "join_to_create_id" INTEGER NOT NULL,
+          "category_id" INTEGER NOT NULL,
+          "max_users" INTEGER NOT NULL,
+          "bitrate" INTEGER NOT NULL,
+          "public" BOOLEAN NOT NULL,
+          "public_role" INTEGER,
+          "permit_update" BOOLEAN NOT NULL,
+          "prefix" TEXT,
+          PRIMARY KEY ("id" AUTOINCREMENT)
+    )
+    """,
+            ],
+        ),
+        Migration(
+            2,
+            "index PRIVATEVOICE lookups",
+            indexes=[
+                Index(
+                    "idx_privatevoice_openchannels_channel",
+                    "PRIVATEVOICE_OPENCHANNELS",
+                    ("channel_id",),
+                ),
+                Index(
+                    "idx_privatevoice_settings_join_to_create",
+                    "PRIVATEVOICE_SETTINGS",
+                    ("join_to_create_id",),
+                ),
+                Index(
+                    "idx_privatevoice_settings_guild",
+                    "PRIVATEVOICE_SETTINGS",
+                    ("guild_id",),
+                ),
+            ],
+        ),
+    ],
+)
+
 
 # Setup
 def setup(
@@ -334,32 +401,8 @@ def __is_channel_flagged_public(channel_id) -> bool:
 
 
 def __setup_database() -> None:
-    _c.executescript(
-        """
-    CREATE TABLE IF NOT EXISTS "PRIVATEVOICE_OPENCHANNELS" (
-        "id" INTEGER NOT NULL,
-        "guild_id" INTEGER NOT NULL,
-        "channel_id" INTEGER NOT NULL,
-        "channelowner_id" INTEGER NOT NULL,
-        "public" BOOLEAN NOT NULL,
-        "permit_update" BOOLEAN NOT NULL,
-        PRIMARY KEY ("id" AUTOINCREMENT)
-    );
-    CREATE TABLE IF NOT EXISTS "PRIVATEVOICE_SETTINGS" (
-          "id" INTEGER NOT NULL,
-          "guild_id" INTEGER NOT NULL,
-          "join_to_create_id" INTEGER NOT NULL,
-          "category_id" INTEGER NOT NULL,
-          "max_users" INTEGER NOT NULL,
-          "bitrate" INTEGER NOT NULL,
-          "public" BOOLEAN NOT NULL,
-          "public_role" INTEGER,
-          "permit_update" BOOLEAN NOT NULL,
-          "prefix" TEXT,
-          PRIMARY KEY ("id" AUTOINCREMENT)
-    )
-    """
-    )
+    for migration in apply_migrations(_conn, "private_voice"):
+        _logger.info(f"Applied database migration {migration}.")
 
 
 def __is_channel_owner(member, channel_id) -> bool:
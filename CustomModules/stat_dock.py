@@ -3,28 +3,141 @@ import sys
 if sys.version_info < (3, 10):
     raise ImportError("This module requires Python 3.10 or higher to work correctly.")
 import asyncio
+import heapq
 import logging
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from time import time
-from typing import Any, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple, Union
 
 import discord
 import pytz
 
 from CustomModules.bitmap_handler import BitmapHandler
+from CustomModules.database_handler import (
+    AsyncDatabaseHandler,
+    Index,
+    Migration,
+    SQLiteDatabaseHandler,
+    apply_migrations,
+    register_migrations,
+)
 
 # Global variables with proper type hints
-_c: sqlite3.Cursor
-_conn: sqlite3.Connection
+# Storage: a plain sqlite3 connection or a database_handler handler. Synchronous
+# storage runs on _executor when the connection may be used from another thread.
+_conn: Optional[sqlite3.Connection] = None
+_handler: Optional[Union[SQLiteDatabaseHandler, AsyncDatabaseHandler]] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_dialect = "sqlite"
+_schema_ready = False  # migrations applied to the configured storage
+_schema_lock: Optional[asyncio.Lock] = None
 _bot: discord.Client
 _logger: logging.Logger
 _bitmap_handler: BitmapHandler
 
+# Scheduler state: channel_id -> (due timestamp, STATDOCK row) of enabled docks and a
+# min-heap of (due, channel_id). Heap entries whose due no longer matches are stale.
+_docks: Dict[int, Tuple[int, tuple]] = {}
+_schedule: List[Tuple[int, int]] = []
+_in_flight: Set[int] = set()  # queued or being updated, further due entries coalesce
+_wakeup: Optional[asyncio.Event] = None
+_RETRY_DELAY = 60  # seconds until a failed update is tried again
+_FLUSH_INTERVAL = 5  # seconds between writes of buffered last_updated timestamps
+_MAX_CONCURRENT_UPDATES = 10  # update workers
+
+# Rename limits as (renames, per seconds). Discord allows 2 renames per 10 minutes
+# per channel; the guild budget keeps one busy guild from starving the others.
+_CHANNEL_RENAME_LIMIT = (2, 600)
+_GUILD_RENAME_LIMIT = (10, 60)
+
+# channel_id -> last_updated of updated docks, not yet written to the database
+_pending_last_updated: Dict[int, int] = {}
+
+# Member, role and channel counts per guild, kept up to date by the listeners of
+# add_listener(). Without them every dock update iterates the guild.
+_counts: Dict[int, "_GuildCounts"] = {}
+_counting = False
+
 # SQL query constants
 SQL_DELETE_STATDOCK_BY_CHANNEL = "DELETE FROM `STATDOCK` WHERE `channel_id` = ?"
 ERR_GUILD_ONLY = "This command can only be used in a guild."
 
+# Schema versions, applied once per database by _setup_database()
+register_migrations(
+    "stat_dock",
+    [
+        Migration(
+            1,
+            "create STATDOCK table",
+            {
+                "*": """
+    CREATE TABLE IF NOT EXISTS "STATDOCK" (
+        `id` integer not null primary key autoincrement,
+        `enabled` BOOLEAN not null default 1,
+        `guild_id` INT not null,
+        `category_id` INT not null,
+        `channel_id` INT not null,
+        `type` INT not null,
+        `timezone` varchar(255) null,
+        `timeformat` varchar(255) null,
+        `role_id` INT null,
+        `prefix` varchar(255) null,
+        `frequency` INT not null,
+        `last_updated` INT not null,
+        `counter` INT not null default 0
+    )
+    """,
+                "mysql": """
+    CREATE TABLE IF NOT EXISTS `STATDOCK` (
+        `id` INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        `enabled` BOOLEAN NOT NULL DEFAULT 1,
+        `guild_id` BIGINT NOT NULL,
+        `category_id` BIGINT NOT NULL,
+        `channel_id` BIGINT NOT NULL,
+        `type` INT NOT NULL,
+        `timezone` VARCHAR(255) NULL,
+        `timeformat` VARCHAR(255) NULL,
+        `role_id` BIGINT NULL,
+        `prefix` VARCHAR(255) NULL,
+        `frequency` INT NOT NULL,
+        `last_updated` BIGINT NOT NULL,
+        `counter` INT NOT NULL DEFAULT 0
+    )
+    """,
+                "postgresql": """
+    CREATE TABLE IF NOT EXISTS "STATDOCK" (
+        "id" SERIAL PRIMARY KEY,
+        "enabled" SMALLINT NOT NULL DEFAULT 1,
+        "guild_id" BIGINT NOT NULL,
+        "category_id" BIGINT NOT NULL,
+        "channel_id" BIGINT NOT NULL,
+        "type" INT NOT NULL,
+        "timezone" VARCHAR(255) NULL,
+        "timeformat" VARCHAR(255) NULL,
+        "role_id" BIGINT NULL,
+        "prefix" VARCHAR(255) NULL,
+        "frequency" INT NOT NULL,
+        "last_updated" BIGINT NOT NULL,
+        "counter" INT NOT NULL DEFAULT 0
+    )
+    """,
+            },
+        ),
+        Migration(
+            2,
+            "index STATDOCK lookups",
+            indexes=[
+                Index("idx_statdock_channel", "STATDOCK", ("channel_id",)),
+                Index("idx_statdock_guild", "STATDOCK", ("guild_id", "enabled")),
+                # Due docks: WHERE enabled = 1 AND last_updated + frequency * 60 < now
+                Index("idx_statdock_due", "STATDOCK", ("enabled", "last_updated")),
+            ],
+        ),
+    ],
+)
+
 _overwrites = discord.PermissionOverwrite(
     create_instant_invite=False,
     kick_members=False,
@@ -103,10 +216,23 @@ _bitmap = [
 def setup(
     client: discord.Client,
     tree: discord.app_commands.CommandTree,
-    connection: Optional[sqlite3.Connection] = None,
+    connection: Optional[
+        Union[sqlite3.Connection, SQLiteDatabaseHandler, AsyncDatabaseHandler]
+    ] = None,
     logger: Optional[logging.Logger] = None,
 ) -> None:
-    global _c, _conn, _bot, _logger, _bitmap_handler
+    """
+    Set up the StatDock module and register its commands.
+
+    connection is where docks are stored: a sqlite3 connection, a SQLiteDatabaseHandler
+    or an AsyncDatabaseHandler (e.g. PostgreSQL shared by several bot processes). Without
+    one, StatDocks.db is used. Queries on SQLite run on a separate thread unless a
+    connection that is bound to the calling thread is passed. With an
+    AsyncDatabaseHandler the schema is migrated on the first query, or when
+    setup_database() is awaited.
+    """
+    global _conn, _handler, _executor, _dialect, _bot, _logger, _bitmap_handler
+    global _schema_ready, _schema_lock
     _bot = client
     _bitmap_handler = BitmapHandler(_bitmap)
 
@@ -115,9 +241,23 @@ def setup(
     if _bot is None:
         raise ValueError("Discord client cannot be None.")
 
+    _conn, _handler, _executor, _dialect = None, None, None, "sqlite"
+    _schema_ready, _schema_lock = False, None
     if connection is None:
-        _conn = sqlite3.connect("StatDocks.db")
-    _c = _conn.cursor()
+        _conn = sqlite3.connect("StatDocks.db", check_same_thread=False)
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="StatDock")
+    elif isinstance(connection, sqlite3.Connection):
+        _conn = connection
+    elif isinstance(connection, (SQLiteDatabaseHandler, AsyncDatabaseHandler)):
+        _handler = connection
+        _dialect = connection.backend.backend_name
+        params = connection.backend.connection_params or {}
+        if isinstance(connection, SQLiteDatabaseHandler) and not params.get(
+            "check_same_thread", True
+        ):
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="StatDock")
+    else:
+        raise TypeError(f"Unsupported connection type: {type(connection).__name__}")
 
     # Setup logger with child hierarchy
     if logger:
@@ -135,71 +275,334 @@ def setup(
     _logger.info("StatDock module has been set up.")
 
 
-async def task() -> None:
-    # Calling this function in setup_hook(), can/will lead to a deadlock!
-    async def _function():
-        _c.execute(
-            "SELECT * FROM `STATDOCK` WHERE `enabled` = 1 AND (last_updated + frequency * 60) < ?",
-            (int(time()),),
+def add_listener() -> None:
+    """
+    Add event listeners that keep member, role and channel counts up to date.
+
+    This function overrides the member, role, channel and guild event handlers of the
+    Discord client with new handlers that call the original handlers (if they exist) and
+    then update the counts. Docks then read their count instead of iterating all members
+    or channels of the guild on every update. Counts of a guild are built once, on the
+    first update after its members were chunked, and rebuilt after a reconnect.
+    """
+    global _counting
+    for event, handler in (
+        ("on_ready", _on_ready),
+        ("on_guild_available", _on_guild_reset),
+        ("on_guild_remove", _on_guild_reset),
+        ("on_member_join", _on_member_join),
+        ("on_member_remove", _on_member_remove),
+        ("on_member_update", _on_member_update),
+        ("on_guild_role_delete", _on_guild_role_delete),
+        ("on_guild_channel_create", _on_guild_channel_create),
+        ("on_guild_channel_delete", _on_guild_channel_delete),
+    ):
+        _chain_event(event, handler)
+    _counting = True
+
+    _logger.info("Listener has been added.")
+
+
+async def setup_database() -> None:
+    """
+    Apply pending StatDock migrations to an AsyncDatabaseHandler.
+
+    setup() cannot await, so with an AsyncDatabaseHandler the schema is migrated on
+    the first StatDock query. Await this after setup() to migrate it up front. Other
+    connections are migrated by setup(), this returns immediately for them.
+    """
+    global _schema_lock, _schema_ready
+    if _schema_ready:
+        return
+    if _schema_lock is None:
+        _schema_lock = asyncio.Lock()
+    async with _schema_lock:
+        if _schema_ready:
+            return
+        if isinstance(_handler, AsyncDatabaseHandler):
+            for migration in await _handler.migrate("stat_dock"):
+                _logger.info(f"Applied database migration {migration}.")
+        _schema_ready = True
+
+
+async def flush() -> None:
+    """
+    Write buffered `last_updated` timestamps of updated docks to the database.
+
+    The task writes them every few seconds in one transaction and when it is cancelled.
+    Await this before closing the database connection if the task does not stop first.
+    """
+    if not _pending_last_updated:
+        return
+    pending = dict(_pending_last_updated)
+    _pending_last_updated.clear()
+    try:
+        await _db_execute_many(
+            "UPDATE `STATDOCK` SET `last_updated` = ? WHERE `channel_id` = ?",
+            [(last_updated, channel_id) for channel_id, last_updated in pending.items()],
         )
-        data = _c.fetchall()
-        for entry in data:
-            guild_id = entry[2]
-            category_id = entry[3]
-            channel_id = entry[4]
-            stat_type = entry[5]
-            timezone = entry[6]
-            timeformat = entry[7]
-            counter = entry[12]
-            role_id = entry[8]
-            prefix = entry[9]
-
-            await _update_dock(
-                enabled=True,
-                guild_id=guild_id,
-                category_id=category_id,
-                channel_id=channel_id,
-                stat_type=stat_type,
-                timezone=timezone,
-                timeformat=timeformat,
-                counter=counter,
-                role_id=role_id,
-                prefix=prefix,
-            )
+    except Exception:
+        # Keep them for the next flush, unless the dock was updated again meanwhile
+        for channel_id, last_updated in pending.items():
+            _pending_last_updated.setdefault(channel_id, last_updated)
+        raise
+
 
+async def task() -> None:
+    # Calling this function in setup_hook(), can/will lead to a deadlock!
+    # Docks are loaded once and kept in a min-heap by next due time, the loop
+    # sleeps until the earliest one is due or the schedule changes.
+    global _wakeup
     await _bot.wait_until_ready()
-    _logger.info("Task has been started.")
+    await setup_database()
+    _wakeup = asyncio.Event()
+    await _load_schedule()
+    _logger.info(f"Task has been started ({len(_docks)} docks scheduled).")
+
+    queue: asyncio.Queue = asyncio.Queue()
+    workers = [
+        asyncio.create_task(_update_worker(queue)) for _ in range(_MAX_CONCURRENT_UPDATES)
+    ]
+    workers.append(asyncio.create_task(_flush_worker()))
+    try:
+        while True:
+            for item in _pop_due_docks(int(time())):
+                queue.put_nowait(item)
+
+            _wakeup.clear()
+            timeout = _schedule[0][0] - time() if _schedule else None
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    except asyncio.CancelledError:
+        pass
+    finally:
+        for worker in workers:
+            worker.cancel()
+        _in_flight.clear()
+        await flush()
+
+
+async def _load_schedule() -> None:
+    """Load all enabled docks from the database into the schedule."""
+    await flush()
+    rows = await _db_execute("SELECT * FROM `STATDOCK` WHERE `enabled` = 1", fetch="all")
+    _docks.clear()
+    _schedule.clear()
+    for row in rows:
+        due = row[11] + row[10] * 60
+        _docks[row[4]] = (due, row)
+        _schedule.append((due, row[4]))
+    heapq.heapify(_schedule)
+
+
+def _schedule_row(row: tuple, due: int) -> None:
+    """Put a dock into the schedule and wake the task if it is due earlier."""
+    _docks[row[4]] = (due, row)
+    heapq.heappush(_schedule, (due, row[4]))
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def _schedule_dock(channel_id: int) -> None:
+    """(Re-)load a dock after it was added or changed, disabled docks are removed."""
+    row = await _db_execute(
+        "SELECT * FROM `STATDOCK` WHERE `channel_id` = ?", (channel_id,), fetch="one"
+    )
+    if row is None or not row[1]:
+        _unschedule_dock(channel_id)
+        return
+    if channel_id in _pending_last_updated:
+        row = row[:11] + (_pending_last_updated[channel_id],) + row[12:]
+    _schedule_row(row, row[11] + row[10] * 60)
+
+
+def _unschedule_dock(channel_id: int) -> None:
+    """Remove a dock from the schedule, its heap entries become stale."""
+    _docks.pop(channel_id, None)
 
+
+def _pop_due_docks(now: int) -> List[Tuple[int, int]]:
+    """Pop all docks due at now as (due, channel_id), skipping stale and queued entries."""
+    due_docks = []
+    while _schedule and _schedule[0][0] <= now:
+        due, channel_id = heapq.heappop(_schedule)
+        entry = _docks.get(channel_id)
+        if entry is None or entry[0] != due or channel_id in _in_flight:
+            continue
+        _in_flight.add(channel_id)
+        due_docks.append((due, channel_id))
+    return due_docks
+
+
+async def _flush_worker() -> None:
+    """Write buffered timestamps every _FLUSH_INTERVAL seconds."""
     while True:
-        await _function()
+        await asyncio.sleep(_FLUSH_INTERVAL)
         try:
-            await asyncio.sleep(10)
-        except asyncio.CancelledError:
-            break
+            await flush()
+        except Exception as e:
+            _logger.warning(f"Writing last_updated failed: {e}")
+
+
+async def _update_worker(queue: asyncio.Queue) -> None:
+    """Take due docks off the queue and update them one at a time."""
+    while True:
+        due, channel_id = await queue.get()
+        try:
+            await _run_scheduled_update(due, channel_id)
+        finally:
+            queue.task_done()
+
+
+async def _run_scheduled_update(due: int, channel_id: int) -> None:
+    """Update one due dock, rescheduling it for a retry if the update did not."""
+    try:
+        # Read the row now, changes made while the dock was queued are picked up
+        entry = _docks.get(channel_id)
+        if entry is None:
+            return
+        row = entry[1]
+        await _update_dock(
+            enabled=True,
+            guild_id=row[2],
+            category_id=row[3],
+            channel_id=channel_id,
+            stat_type=row[5],
+            timezone=row[6],
+            timeformat=row[7],
+            counter=row[12],
+            role_id=row[8],
+            prefix=row[9],
+        )
+    except Exception as e:
+        _logger.warning(f"Updating dock {channel_id} failed: {e}")
+    finally:
+        _in_flight.discard(channel_id)
+        entry = _docks.get(channel_id)
+        if entry is not None and entry[0] == due:
+            _schedule_row(entry[1], int(time()) + _RETRY_DELAY)
+
+
+class _TokenBucket:
+    """Allows capacity operations per period, refilling continuously."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time()
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available, 0 if one is available now."""
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self.delay(now)
+        self.tokens -= 1
+
+
+_channel_buckets: Dict[int, _TokenBucket] = {}
+_guild_buckets: Dict[int, _TokenBucket] = {}
+
+
+def _rename_buckets(guild_id: int, channel_id: int) -> Tuple[_TokenBucket, _TokenBucket]:
+    channel_bucket = _channel_buckets.get(channel_id)
+    if channel_bucket is None:
+        channel_bucket = _channel_buckets[channel_id] = _TokenBucket(*_CHANNEL_RENAME_LIMIT)
+    guild_bucket = _guild_buckets.get(guild_id)
+    if guild_bucket is None:
+        guild_bucket = _guild_buckets[guild_id] = _TokenBucket(*_GUILD_RENAME_LIMIT)
+    return channel_bucket, guild_bucket
+
+
+def _rename_delay(guild_id: int, channel_id: int) -> float:
+    """Seconds until the channel may be renamed without hitting a rate limit."""
+    now = time()
+    return max(bucket.delay(now) for bucket in _rename_buckets(guild_id, channel_id))
+
+
+def _count_rename(guild_id: int, channel_id: int) -> None:
+    now = time()
+    for bucket in _rename_buckets(guild_id, channel_id):
+        bucket.take(now)
 
 
 def _setup_database() -> None:
-    if _conn is None:
+    global _schema_ready
+    if _conn is None and _handler is None:
         raise ValueError("Database connection is not initialized.")
-    _c.executescript(
-        """
-    CREATE TABLE IF NOT EXISTS "STATDOCK" (
-        `id` integer not null primary key autoincrement,
-        `enabled` BOOLEAN not null default 1,
-        `guild_id` INT not null,
-        `category_id` INT not null,
-        `channel_id` INT not null,
-        `type` INT not null,
-        `timezone` varchar(255) null,
-        `timeformat` varchar(255) null,
-        `role_id` INT null,
-        `prefix` varchar(255) null,
-        `frequency` INT not null,
-        `last_updated` INT not null,
-        `counter` INT not null default 0
-    )
-    """
-    )
+    if isinstance(_handler, AsyncDatabaseHandler):
+        # Migrated by setup_database() on the first query, setup() cannot await
+        return
+    if _handler is not None:
+        applied = _handler.migrate("stat_dock")
+    else:
+        applied = apply_migrations(_conn, "stat_dock")
+    for migration in applied:
+        _logger.info(f"Applied database migration {migration}.")
+    _schema_ready = True
+
+
+# Storage
+async def _db_execute(query: str, params: tuple = (), fetch: Optional[str] = None) -> Any:
+    """Run a query on the configured storage; rows are tuples, writes are committed."""
+    if _dialect == "postgresql":
+        query = query.replace("`", '"')
+    if isinstance(_handler, AsyncDatabaseHandler):
+        await setup_database()
+        return await _handler.execute(
+            query, params, commit=fetch is None, fetch=fetch, row_format="tuple"
+        )
+    return await _run_sync(_sync_execute, query, params, fetch)
+
+
+async def _db_execute_many(query: str, params_list: List[tuple]) -> None:
+    """Run a write for every parameter tuple in one transaction."""
+    if _dialect == "postgresql":
+        query = query.replace("`", '"')
+    if isinstance(_handler, AsyncDatabaseHandler):
+        await setup_database()
+        await _handler.execute_many(query, params_list)
+    else:
+        await _run_sync(_sync_execute_many, query, params_list)
+
+
+async def _run_sync(func, *args) -> Any:
+    if _executor is None:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+def _sync_execute(query: str, params: tuple, fetch: Optional[str]) -> Any:
+    if _handler is not None:
+        return _handler.execute(
+            query, params, commit=fetch is None, fetch=fetch, row_format="tuple"
+        )
+    cursor = _conn.execute(query, params)
+    try:
+        if fetch == "one":
+            return cursor.fetchone()
+        if fetch == "all":
+            return cursor.fetchall()
+        _conn.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def _sync_execute_many(query: str, params_list: List[tuple]) -> None:
+    if _handler is not None:
+        _handler.execute_many(query, params_list)
+        return
+    _conn.executemany(query, params_list)
+    _conn.commit()
 
 
 # Main functions
@@ -259,8 +662,9 @@ async def _init_dock(
     except Exception as e:
         _logger.warning(e)
         return str(e)
+    _count_rename(guild.id, channel.id)
 
-    _c.execute(
+    await _db_execute(
         "INSERT INTO `STATDOCK` (guild_id, category_id, channel_id, type, timezone, timeformat, prefix, frequency, last_updated, counter, role_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
         (
             guild.id,
@@ -284,7 +688,7 @@ async def _init_dock(
             None if not role else role.id,
         ),
     )
-    _conn.commit()
+    await _schedule_dock(channel.id)
 
 
 async def _re_init_dock(
@@ -300,7 +704,7 @@ async def _re_init_dock(
     ignore_none_category: bool = False,
 ) -> None:
     # Re-initializes the dock, if the channel got deleted and the stat dock not disabled/deleted.
-    if _conn is None:
+    if _conn is None and _handler is None:
         raise ValueError("Database connection is not initialized.")
     guild: Optional[discord.Guild] = await _get_or_fetch("guild", guild_id)
     category: Optional[discord.CategoryChannel] = await _get_or_fetch("channel", category_id)
@@ -315,8 +719,8 @@ async def _re_init_dock(
         or (category is None and not ignore_none_category)
         or (stat_type == "role" and role is None)
     ):
-        _c.execute(SQL_DELETE_STATDOCK_BY_CHANNEL, (channel_id,))
-        _conn.commit()
+        await _db_execute(SQL_DELETE_STATDOCK_BY_CHANNEL, (channel_id,))
+        _unschedule_dock(channel_id)
         return
     
     try:
@@ -376,7 +780,7 @@ async def _re_init_dock(
                 )
 
         if created_channel:
-            _c.execute(
+            await _db_execute(
                 "UPDATE `STATDOCK` SET `last_updated` = ?, `channel_id` = ?, enabled = 1 WHERE `channel_id` = ?",
                 (
                     int(time()),
@@ -384,7 +788,8 @@ async def _re_init_dock(
                     channel_id,
                 ),
             )
-            _conn.commit()
+            _unschedule_dock(channel_id)
+            await _schedule_dock(created_channel.id)
     except Exception as e:
         _logger.warning(e)
 
@@ -402,15 +807,15 @@ async def _update_dock(
     prefix,
 ) -> Optional[bool]:
     # Updates a dock.
-    if _conn is None:
+    if _conn is None and _handler is None:
         raise ValueError("Database connection is not initialized.")
     channel_result = await _get_or_fetch("channel", channel_id)
     guild_result = await _get_or_fetch("guild", guild_id)
     stat_type = _bitmap_handler.get_active_keys(stat_type, single=True)
     if not channel_result or not guild_result:
         if not enabled:
-            _c.execute("DELETE FROM `STATDOCK` WHERE `channel_id` = ?", (channel_id,))
-            _conn.commit()
+            await _db_execute(SQL_DELETE_STATDOCK_BY_CHANNEL, (channel_id,))
+            _unschedule_dock(channel_id)
             return False
         else:
             await _re_init_dock(
@@ -467,23 +872,135 @@ async def _update_dock(
                     )
                     new_name = f"{prefix + ' ' if prefix else ''}{channels_in_guild}"
             if new_name and channel.name != new_name:
+                # Defer instead of letting discord.py wait out the rate limit, the
+                # deferred update renders the name again when it runs
+                delay = _rename_delay(guild_id, channel_id)
+                if delay > 0:
+                    entry = _docks.get(channel_id)
+                    if entry is not None:
+                        _schedule_row(entry[1], int(time()) + int(delay) + 1)
+                    _logger.debug(f"Renaming dock {channel_id} deferred by {delay:.0f}s.")
+                    return
+                _count_rename(guild_id, channel_id)
                 await channel.edit(name=new_name)
-            _c.execute(
-                "UPDATE `STATDOCK` SET `last_updated` = ? WHERE `channel_id` = ?",
-                (
-                    int(time()),
-                    channel_id,
-                ),
-            )
-            _conn.commit()
+            last_updated = int(time())
+            _pending_last_updated[channel_id] = last_updated
+            entry = _docks.get(channel_id)
+            if entry is not None:
+                row = entry[1][:11] + (last_updated,) + entry[1][12:]
+                _schedule_row(row, last_updated + row[10] * 60)
         except Exception as e:
             _logger.warning(e)
 
 
+# Incremental counters
+class _GuildCounts:
+    """Member counts as [users, bots] in total and per role, channel counts by kind."""
+
+    __slots__ = ("members", "roles", "channels")
+
+    def __init__(self, guild: discord.Guild):
+        self.members = [0, 0]
+        self.roles: Dict[int, List[int]] = {}
+        self.channels: Dict[str, int] = {}
+        for member in guild.members:
+            self.add_member(member, 1)
+        for channel in guild.channels:
+            self.add_channel(channel, 1)
+
+    def add_member(self, member: discord.Member, delta: int) -> None:
+        self.members[member.bot] += delta
+        for role in member.roles:
+            self.add_role(role.id, member.bot, delta)
+
+    def add_role(self, role_id: int, bot: bool, delta: int) -> None:
+        self.roles.setdefault(role_id, [0, 0])[bot] += delta
+
+    def add_channel(self, channel: Any, delta: int) -> None:
+        kind = _channel_kind(channel)
+        if kind is not None:
+            self.channels[kind] = self.channels.get(kind, 0) + delta
+
+
+def _guild_counts(guild: discord.Guild) -> Optional[_GuildCounts]:
+    """Counts of a guild, None without listeners or while its members are not chunked."""
+    if not _counting:
+        return None
+    counts = _counts.get(guild.id)
+    if counts is None and guild.chunked:
+        counts = _counts[guild.id] = _GuildCounts(guild)
+    return counts
+
+
+def _chain_event(event: str, handler) -> None:
+    original = getattr(_bot, event, None)
+
+    async def chained(*args):
+        if original:
+            await original(*args)
+        handler(*args)
+
+    setattr(_bot, event, chained)
+
+
+def _on_ready() -> None:
+    # Events missed while disconnected are not replayed, count again
+    _counts.clear()
+
+
+def _on_guild_reset(guild: discord.Guild) -> None:
+    _counts.pop(guild.id, None)
+
+
+def _on_member_join(member: discord.Member) -> None:
+    counts = _counts.get(member.guild.id)
+    if counts is not None:
+        counts.add_member(member, 1)
+
+
+def _on_member_remove(member: discord.Member) -> None:
+    counts = _counts.get(member.guild.id)
+    if counts is not None:
+        counts.add_member(member, -1)
+
+
+def _on_member_update(before: discord.Member, after: discord.Member) -> None:
+    counts = _counts.get(after.guild.id)
+    if counts is None or before.roles == after.roles:
+        return
+    before_roles = {role.id for role in before.roles}
+    after_roles = {role.id for role in after.roles}
+    for role_id in after_roles - before_roles:
+        counts.add_role(role_id, after.bot, 1)
+    for role_id in before_roles - after_roles:
+        counts.add_role(role_id, after.bot, -1)
+
+
+def _on_guild_role_delete(role: discord.Role) -> None:
+    counts = _counts.get(role.guild.id)
+    if counts is not None:
+        counts.roles.pop(role.id, None)
+
+
+def _on_guild_channel_create(channel: Any) -> None:
+    counts = _counts.get(channel.guild.id)
+    if counts is not None:
+        counts.add_channel(channel, 1)
+
+
+def _on_guild_channel_delete(channel: Any) -> None:
+    counts = _counts.get(channel.guild.id)
+    if counts is not None:
+        counts.add_channel(channel, -1)
+
+
 # Helper functions
 async def _count_members_in_guild(
     guild: discord.Guild, countbots: bool, countusers: bool
 ) -> int:
+    counts = _guild_counts(guild)
+    if counts is not None:
+        return countusers * counts.members[0] + countbots * counts.members[1]
     members = [
         member
         for member in guild.members
@@ -497,6 +1014,10 @@ async def _count_members_by_role(
 ) -> int:
     if role is None:
         return 0
+    counts = _guild_counts(role.guild)
+    if counts is not None:
+        users, bots = counts.roles.get(role.id, (0, 0))
+        return countusers * users + countbots * bots
     members_in_role = [
         member
         for member in role.members
@@ -513,24 +1034,42 @@ async def _count_channels_in_guild(
     countstage: bool,
     countforum: bool,
 ) -> int:
-    count = 0
+    enabled = {
+        "counttext": counttext,
+        "countvoice": countvoice,
+        "countcategory": countcategory,
+        "countstage": countstage,
+        "countforum": countforum,
+    }
+    counts = _guild_counts(guild)
+    if counts is not None:
+        return sum(count for kind, count in counts.channels.items() if enabled[kind])
 
+    count = 0
     for channel in guild.channels:
-        match channel:
-            case discord.TextChannel() if counttext:
-                count += 1
-            case discord.VoiceChannel() if countvoice:
-                count += 1
-            case discord.CategoryChannel() if countcategory:
-                count += 1
-            case discord.StageChannel() if countstage:
-                count += 1
-            case discord.ForumChannel() if countforum:
-                count += 1
+        kind = _channel_kind(channel)
+        if kind is not None and enabled[kind]:
+            count += 1
 
     return count
 
 
+def _channel_kind(channel: Any) -> Optional[str]:
+    """Counter key of a channel type, None for types that are not counted."""
+    match channel:
+        case discord.TextChannel():
+            return "counttext"
+        case discord.VoiceChannel():
+            return "countvoice"
+        case discord.CategoryChannel():
+            return "countcategory"
+        case discord.StageChannel():
+            return "countstage"
+        case discord.ForumChannel():
+            return "countforum"
+    return None
+
+
 async def _get_or_fetch(item: str, item_id: int) -> Optional[Any]:
     """
     Attempts to retrieve an object using the 'get_<item>' method of the bot class, and
@@ -782,9 +1321,13 @@ async def _statdock_update(
 ) -> None:
     await interaction.response.defer(ephemeral=True)
 
-    is_dock = _c.execute(
-        "SELECT EXISTS(SELECT 1 FROM STATDOCK WHERE `channel_id` = ?)", (dock.id,)
-    ).fetchone()[0]
+    is_dock = (
+        await _db_execute(
+            "SELECT EXISTS(SELECT 1 FROM `STATDOCK` WHERE `channel_id` = ?)",
+            (dock.id,),
+            fetch="one",
+        )
+    )[0]
     if not is_dock:
         await interaction.followup.send(
             content=f"The channel {dock.mention} isn't a dock."
@@ -793,49 +1336,59 @@ async def _statdock_update(
 
     match action:
         case "enable":
-            enabled = _c.execute(
-                "SELECT `enabled` FROM `STATDOCK` WHERE `channel_id` = ?", (dock.id,)
-            ).fetchone()[0]
+            enabled = (
+                await _db_execute(
+                    "SELECT `enabled` FROM `STATDOCK` WHERE `channel_id` = ?",
+                    (dock.id,),
+                    fetch="one",
+                )
+            )[0]
             if enabled:
                 await interaction.followup.send("This dock is already enabled.")
                 return
-            _c.execute(
+            await _db_execute(
                 "UPDATE `STATDOCK` SET `enabled` = 1 WHERE `channel_id` = ?", (dock.id,)
             )
+            await _schedule_dock(dock.id)
             await interaction.followup.send("Dock enabled.")
 
         case "disable":
-            enabled = _c.execute(
-                "SELECT `enabled` FROM `STATDOCK` WHERE `channel_id` = ?", (dock.id,)
-            ).fetchone()[0]
+            enabled = (
+                await _db_execute(
+                    "SELECT `enabled` FROM `STATDOCK` WHERE `channel_id` = ?",
+                    (dock.id,),
+                    fetch="one",
+                )
+            )[0]
             if not enabled:
                 await interaction.followup.send("This dock is already disabled.")
                 return
-            _c.execute(
+            await _db_execute(
                 "UPDATE `STATDOCK` SET `enabled` = 0 WHERE `channel_id` = ?", (dock.id,)
             )
+            _unschedule_dock(dock.id)
             await interaction.followup.send("Dock disabled.")
 
         case "delete":
-            _c.execute(SQL_DELETE_STATDOCK_BY_CHANNEL, (dock.id,))
+            await _db_execute(SQL_DELETE_STATDOCK_BY_CHANNEL, (dock.id,))
+            _unschedule_dock(dock.id)
             await dock.delete()
             await interaction.followup.send("Dock deleted.")
 
         case "prefix":
-            _c.execute(
+            await _db_execute(
                 "UPDATE `STATDOCK` SET `prefix` = ? WHERE `channel_id` = ?",
                 (
                     prefix if prefix != "DELETE" else None,
                     dock.id,
                 ),
             )
+            await _schedule_dock(dock.id)
             if prefix == "DELETE":
                 await interaction.followup.send("Prefix removed.")
             else:
                 await interaction.followup.send(f"Prefix changed to `{prefix}`.")
 
-    _conn.commit()
-
 
 @discord.app_commands.command(
     name="statdock_list", description="Lists every created stat dock."
@@ -849,8 +1402,10 @@ async def _statdock_list(interaction: discord.Interaction) -> None:
         await interaction.followup.send(ERR_GUILD_ONLY)
         return
 
-    _c.execute("SELECT * FROM STATDOCK WHERE `guild_id` = ?", (interaction.guild.id,))
-    data = _c.fetchall()
+    await flush()
+    data = await _db_execute(
+        "SELECT * FROM `STATDOCK` WHERE `guild_id` = ?", (interaction.guild.id,), fetch="all"
+    )
 
     if not data:
         await interaction.followup.send("No embeds found for this server.")
@@ -935,11 +1490,11 @@ async def _statdock_enable_hidden(interaction: discord.Interaction) -> None:
         await interaction.followup.send(ERR_GUILD_ONLY)
         return
 
-    _c.execute(
+    data = await _db_execute(
         "SELECT * FROM `STATDOCK` WHERE `enabled` = 0 AND `guild_id` = ?",
         (interaction.guild.id,),
+        fetch="all",
     )
-    data = _c.fetchall()
     for entry in data:
         channel = interaction.guild.get_channel(entry[4])
         if channel is not None:
@@ -1,12 +1,21 @@
 """Type stubs for stat_dock module."""
 import logging
 import sqlite3
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
 import discord
 
+from CustomModules.database_handler import AsyncDatabaseHandler, SQLiteDatabaseHandler
+
 def setup(
     client: discord.Client,
-    connection: Optional[sqlite3.Connection] = None,
+    tree: discord.app_commands.CommandTree,
+    connection: Optional[
+        Union[sqlite3.Connection, SQLiteDatabaseHandler, AsyncDatabaseHandler]
+    ] = None,
     logger: Optional[logging.Logger] = None,
 ) -> None: ...
+def add_listener() -> None: ...
+async def setup_database() -> None: ...
+async def flush() -> None: ...
+async def task() -> None: ...
@@ -0,0 +1,161 @@
+"""
+Import-time benchmark for the CustomModules package.
+
+Short-lived worker processes pay the package import on every start. This
+starts fresh interpreters and measures the cold import of the package, of
+single submodules and of every available submodule (what `import
+CustomModules` cost before submodules were loaded lazily), together with
+the number of modules each import pulls in. Results (p50/p99 import time,
+process wall time) are written as JSON to compare releases.
+
+Usage:
+    python benchmarks/import_time_benchmark.py --output imports.json
+
+    # Also print the slowest imports of one scenario (python -X importtime)
+    python benchmarks/import_time_benchmark.py --runs 10 --importtime package
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import CustomModules  # noqa: E402
+
+# Third-party packages whose presence in sys.modules is reported per scenario
+HEAVY_DEPENDENCIES = ("discord", "aiohttp", "bs4", "colorama", "google", "pytz", "requests")
+
+# Runs in a fresh interpreter: time the statement, report what it loaded
+CHILD = """
+import json, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+loaded = set(sys.modules) - before
+print(json.dumps({{
+    "seconds": elapsed,
+    "modules": len(loaded),
+    "heavy": sorted({{name.split(".")[0] for name in loaded}} & set({heavy!r})),
+}}))
+"""
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def scenarios() -> Dict[str, str]:
+    """Statements to time, keyed by scenario name"""
+    available = CustomModules.available_modules()
+    statements = {
+        "interpreter": "pass",
+        "package": "import CustomModules",
+    }
+    for module in ("log_handler", "database_handler", "bitmap_handler"):
+        if module in available:
+            statements[module] = f"from CustomModules import {module}"
+    # Equivalent of the former eager __init__: every importable submodule
+    statements["all_available"] = "; ".join(
+        ["import CustomModules"] + [f"CustomModules.{module}" for module in available]
+    )
+    return statements
+
+
+def run_child(statement: str, extra_args: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Time one statement in a fresh interpreter"""
+    code = CHILD.format(statement=statement, heavy=HEAVY_DEPENDENCIES)
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *(extra_args or []), "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["wall"] = wall
+    result["stderr"] = completed.stderr
+    return result
+
+
+def bench_scenario(name: str, statement: str, runs: int) -> Dict[str, Any]:
+    """Run one scenario runs times and summarise it"""
+    samples = [run_child(statement) for _ in range(runs)]
+    imports = sorted(sample["seconds"] for sample in samples)
+    walls = sorted(sample["wall"] for sample in samples)
+    return {
+        "group": "import",
+        "name": name,
+        "runs": runs,
+        "import_p50_ms": round(_percentile(imports, 0.50) * 1000, 3),
+        "import_p99_ms": round(_percentile(imports, 0.99) * 1000, 3),
+        "process_p50_ms": round(_percentile(walls, 0.50) * 1000, 3),
+        "modules_loaded": samples[-1]["modules"],
+        "heavy_dependencies": samples[-1]["heavy"],
+    }
+
+
+def print_importtime(statement: str, top: int) -> None:
+    """Print the slowest cumulative imports reported by python -X importtime"""
+    stderr = run_child(statement, ["-X", "importtime"])["stderr"]
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name.strip()))
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:10.2f} ms  {name}", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", "-o", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--runs", type=int, default=20, help="Fresh interpreters per scenario")
+    parser.add_argument(
+        "--importtime", metavar="SCENARIO", help="Print the slowest imports of a scenario"
+    )
+    args = parser.parse_args()
+
+    statements = scenarios()
+    if args.importtime:
+        if args.importtime not in statements:
+            parser.error(f"unknown scenario, choose from: {', '.join(statements)}")
+        print_importtime(statements[args.importtime], 15)
+
+    results = [bench_scenario(name, statement, args.runs) for name, statement in statements.items()]
+    report = json.dumps(
+        {
+            "meta": {
+                "version": CustomModules.__version__,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "available_modules": CustomModules.available_modules(),
+            },
+            "results": results,
+        },
+        indent=2,
+    )
+    if args.output:
+        Path(args.output).write_text(report + "\n", encoding="utf-8")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()